@@ -497,7 +497,7 @@ def cmd_transition(args):
     return 0
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser()
     sub = parser.add_subparsers(dest="cmd", required=True)
 
@@ -521,7 +521,7 @@ def main():
     p_transition.add_argument("--to", dest="to_status", required=True)
     p_transition.set_defaults(func=cmd_transition)
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     return args.func(args)
 
 
@@ -1,6 +1,12 @@
+import contextlib
+import importlib.machinery
+import importlib.util
+import io
 import json
 import os
+import shutil
 import subprocess
+import sys
 import tempfile
 import time
 import unittest
@@ -15,173 +21,183 @@ INIT = SCRIPTS / "init-task-board"
 REBUILD = SCRIPTS / "rebuild-snapshot"
 RECOVER = SCRIPTS / "recover-stale-locks"
 INBOUND = SCRIPTS / "feishu-inbound-router"
+BOARD_STR, MILE_STR, INIT_STR = map(os.fspath, (BOARD, MILE, INIT))
+REBUILD_STR, RECOVER_STR, INBOUND_STR = map(os.fspath, (REBUILD, RECOVER, INBOUND))
+# Run Python scripts with the interpreter running the tests, by absolute path.
+PYTHON = sys.executable
 
+# Test roots only hold small state files that nothing needs to persist, so put
+# them on tmpfs where available (Linux) and fall back to the default temp dir.
+# OC_TEST_TMPFS points them at another RAM-backed directory, e.g. on CI.
+SHM = "/dev/shm"
+TMP_DIR = os.environ.get("OC_TEST_TMPFS") or (SHM if os.path.isdir(SHM) and os.access(SHM, os.W_OK) else None)
 
-def run_json(cmd, cwd=REPO):
-    proc = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=False)
-    if proc.returncode != 0:
-        raise AssertionError(f"command failed: {cmd}\nstdout={proc.stdout}\nstderr={proc.stderr}")
+# Canned --spawn-output payloads for dispatch tests.
+SPAWN_DONE_WITH_EVIDENCE = '{"status":"done","message":"T-001 已完成，证据: logs/run.log"}'
+SPAWN_DONE_WITHOUT_EVIDENCE = '{"status":"done","message":"我已经定位到问题，接下来会修复"}'
+
+# Python entry points that run_json calls in-process instead of spawning a fresh
+# interpreter for every command.
+IN_PROCESS = {
+    BOARD_STR: "task_board",
+    MILE_STR: "milestones",
+    REBUILD_STR: "rebuild_snapshot",
+    RECOVER_STR: "recover_stale_locks",
+    INBOUND_STR: "feishu_inbound_router",
+}
+
+
+def _load_module(path, name):
+    # Register loaded scripts in sys.modules so each one is executed once per
+    # test process rather than once per command.
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    # Most scripts have no .py suffix, so name the source loader explicitly.
+    loader = importlib.machinery.SourceFileLoader(name, str(path))
+    spec = importlib.util.spec_from_file_location(name, str(path), loader=loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
     try:
-        return json.loads(proc.stdout.strip())
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def _run_in_process(path, name, argv):
+    module = _load_module(path, name)
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            code = module.main(argv)
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+    return code, stdout.getvalue(), stderr.getvalue()
+
+
+def _text(raw):
+    return raw.decode("utf-8", "replace") if isinstance(raw, bytes) else raw
+
+
+def run_json(cmd, cwd=None):
+    script, argv = (cmd[1], cmd[2:]) if cmd[0] == PYTHON else (cmd[0], cmd[1:])
+    if script in IN_PROCESS:
+        code, stdout, stderr = _run_in_process(script, IN_PROCESS[script], argv)
+    else:
+        # Keep subprocess output as bytes: json.loads parses them directly, and
+        # only the failure messages need decoded text.
+        proc = subprocess.run(cmd, cwd=cwd, capture_output=True, check=False)
+        code, stdout, stderr = proc.returncode, proc.stdout, proc.stderr
+    if code != 0:
+        raise AssertionError(f"command failed: {cmd}\nstdout={_text(stdout)}\nstderr={_text(stderr)}")
+    try:
+        return json.loads(stdout)
     except Exception as err:
-        raise AssertionError(f"invalid json output: {err}\nstdout={proc.stdout}\nstderr={proc.stderr}")
+        raise AssertionError(f"invalid json output: {err}\nstdout={_text(stdout)}\nstderr={_text(stderr)}")
 
 
 class RuntimeTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # One temp directory per class holds the template and every test root.
+        # TemporaryDirectory registers a weakref finalizer, so it is removed even
+        # if tearDownClass never runs.
+        cls.tmp = tempfile.TemporaryDirectory(dir=TMP_DIR)
+        cls.base = Path(cls.tmp.name)
+        # init-task-board output is identical for every test, so build it once
+        # and give each test a fresh copy.
+        cls.template_root = cls.base / "template"
+        subprocess.run([INIT_STR, "--root", str(cls.template_root)], check=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
     def setUp(self):
-        self.tmp = tempfile.TemporaryDirectory()
-        self.root = Path(self.tmp.name)
-        subprocess.run([str(INIT), "--root", str(self.root)], cwd=REPO, check=True)
+        self.root = self.base / self._testMethodName
+        shutil.copytree(self.template_root, self.root)
+        self.root_args = ("--root", str(self.root))
 
     def tearDown(self):
-        self.tmp.cleanup()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _board_apply(self, actor, text):
+        return run_json([PYTHON, BOARD_STR, "apply", *self.root_args, "--actor", actor, "--text", text])
+
+    def _seed(self, *steps):
+        for actor, text in steps:
+            self._board_apply(actor, text)
+
+    def _milestones_argv(self, subcmd, **opts):
+        # task_id="T-001" -> --task-id T-001; True -> bare flag; False/None -> omitted.
+        argv = [PYTHON, MILE_STR, subcmd, *self.root_args]
+        for key, value in opts.items():
+            flag = "--" + key.replace("_", "-")
+            if value is True:
+                argv.append(flag)
+            elif value is not False and value is not None:
+                argv += [flag, str(value)]
+        return argv
 
     def test_dispatch_spawn_closes_task_done(self):
-        run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "@coder create task T-001: 完成闭环",
-        ])
+        self._seed(("orchestrator", "@coder create task T-001: 完成闭环"))
 
-        dispatch = run_json([
-            "python3",
-            str(MILE),
+        dispatch = run_json(self._milestones_argv(
             "dispatch",
-            "--root",
-            str(self.root),
-            "--task-id",
-            "T-001",
-            "--agent",
-            "coder",
-            "--mode",
-            "dry-run",
-            "--spawn",
-            "--spawn-output",
-            '{"status":"done","message":"T-001 已完成，证据: logs/run.log"}',
-        ])
+            task_id="T-001",
+            agent="coder",
+            mode="dry-run",
+            spawn=True,
+            spawn_output=SPAWN_DONE_WITH_EVIDENCE,
+        ))
         self.assertTrue(dispatch["ok"], dispatch)
         self.assertTrue(dispatch["autoClose"], dispatch)
         self.assertEqual(dispatch["spawn"]["decision"], "done", dispatch)
 
-        status = run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "status T-001",
-        ])
+        status = self._board_apply("orchestrator", "status T-001")
         self.assertEqual(status["task"]["status"], "done", status)
 
     def test_dispatch_spawn_done_without_evidence_is_blocked(self):
-        run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "@debugger create task T-005: 证据门禁测试",
-        ])
+        self._seed(("orchestrator", "@debugger create task T-005: 证据门禁测试"))
 
-        dispatch = run_json([
-            "python3",
-            str(MILE),
+        dispatch = run_json(self._milestones_argv(
             "dispatch",
-            "--root",
-            str(self.root),
-            "--task-id",
-            "T-005",
-            "--agent",
-            "debugger",
-            "--mode",
-            "dry-run",
-            "--spawn",
-            "--spawn-output",
-            '{"status":"done","message":"我已经定位到问题，接下来会修复"}',
-        ])
+            task_id="T-005",
+            agent="debugger",
+            mode="dry-run",
+            spawn=True,
+            spawn_output=SPAWN_DONE_WITHOUT_EVIDENCE,
+        ))
         self.assertTrue(dispatch["ok"], dispatch)
         self.assertEqual(dispatch["spawn"]["decision"], "blocked", dispatch)
         self.assertEqual(dispatch["spawn"]["reasonCode"], "incomplete_output", dispatch)
 
-        status = run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "status T-005",
-        ])
+        status = self._board_apply("orchestrator", "status T-005")
         self.assertEqual(status["task"]["status"], "blocked", status)
 
     def test_feishu_router_handles_claim_done_commands(self):
-        run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "@coder create task T-002: 命令入口测试",
-        ])
+        self._seed(("orchestrator", "@coder create task T-002: 命令入口测试"))
 
-        claim = run_json([
-            "python3",
-            str(MILE),
+        claim = run_json(self._milestones_argv(
             "feishu-router",
-            "--root",
-            str(self.root),
-            "--actor",
-            "coder",
-            "--text",
-            "@orchestrator claim T-002",
-            "--mode",
-            "dry-run",
-        ])
+            actor="coder",
+            text="@orchestrator claim T-002",
+            mode="dry-run",
+        ))
         self.assertTrue(claim["ok"], claim)
 
-        done = run_json([
-            "python3",
-            str(MILE),
+        done = run_json(self._milestones_argv(
             "feishu-router",
-            "--root",
-            str(self.root),
-            "--actor",
-            "coder",
-            "--text",
-            "@orchestrator done T-002: 已完成，证据: docs/protocol.md",
-            "--mode",
-            "dry-run",
-        ])
+            actor="coder",
+            text="@orchestrator done T-002: 已完成，证据: docs/protocol.md",
+            mode="dry-run",
+        ))
         self.assertTrue(done["ok"], done)
 
-        status = run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "status T-002",
-        ])
+        status = self._board_apply("orchestrator", "status T-002")
         self.assertEqual(status["task"]["status"], "done", status)
 
     def test_clarify_global_throttle(self):
@@ -204,72 +220,32 @@ class RuntimeTests(unittest.TestCase):
         )
 
         second_proc = subprocess.run(
-            [
-                "python3",
-                str(MILE),
+            self._milestones_argv(
                 "clarify",
-                "--root",
-                str(self.root),
-                "--task-id",
-                "T-003",
-                "--role",
-                "debugger",
-                "--question",
-                "请提供错误栈",
-                "--mode",
-                "dry-run",
-                "--state-file",
-                str(state_file),
-            ],
-            cwd=REPO,
+                task_id="T-003",
+                role="debugger",
+                question="请提供错误栈",
+                mode="dry-run",
+                state_file=state_file,
+            ),
             capture_output=True,
-            text=True,
             check=False,
         )
-        self.assertNotEqual(second_proc.returncode, 0, second_proc.stdout + second_proc.stderr)
-        payload = json.loads(second_proc.stdout.strip())
+        self.assertNotEqual(second_proc.returncode, 0, _text(second_proc.stdout + second_proc.stderr))
+        payload = json.loads(second_proc.stdout)
         self.assertTrue(payload.get("throttled"), payload)
 
     def test_rebuild_and_recover_scripts(self):
-        run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "@coder create task T-004: rebuild",
-        ])
-        run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "coder",
-            "--text",
-            "@coder claim task T-004",
-        ])
-        run_json([
-            "python3",
-            str(BOARD),
-            "apply",
-            "--root",
-            str(self.root),
-            "--actor",
-            "orchestrator",
-            "--text",
-            "mark done T-004: done",
-        ])
+        self._seed(
+            ("orchestrator", "@coder create task T-004: rebuild"),
+            ("coder", "@coder claim task T-004"),
+            ("orchestrator", "mark done T-004: done"),
+        )
 
         compact_out = self.root / "state" / "tasks.compacted.jsonl"
         rebuild = run_json([
-            str(REBUILD),
-            "--root",
-            str(self.root),
+            REBUILD_STR,
+            *self.root_args,
             "--apply",
             "--compact-jsonl",
             str(compact_out),
@@ -279,33 +255,33 @@ class RuntimeTests(unittest.TestCase):
 
         lock_dir = self.root / "state" / "locks"
         stale = lock_dir / "manual.lock"
+        now_ts = int(time.time())
         stale.write_text(
             json.dumps(
                 {
                     "owner": "test",
                     "pid": 999999,
                     "createdAt": "2026-01-01T00:00:00Z",
-                    "createdAtTs": int(time.time()) - 3600,
-                    "expiresAtTs": int(time.time()) - 1800,
+                    "createdAtTs": now_ts - 3600,
+                    "expiresAtTs": now_ts - 1800,
                 }
             )
             + "\n",
             encoding="utf-8",
         )
 
-        dry = run_json([str(RECOVER), "--root", str(self.root), "--dry-run"])
+        dry = run_json([RECOVER_STR, *self.root_args, "--dry-run"])
         self.assertTrue(any(c["path"].endswith("manual.lock") for c in dry["candidates"]), dry)
 
-        apply = run_json([str(RECOVER), "--root", str(self.root), "--apply"])
+        apply = run_json([RECOVER_STR, *self.root_args, "--apply"])
         self.assertTrue(apply["ok"], apply)
         self.assertFalse(stale.exists(), apply)
 
     def test_inbound_ignores_bot_loop(self):
         out = run_json([
-            "python3",
-            str(INBOUND),
-            "--root",
-            str(self.root),
+            PYTHON,
+            INBOUND_STR,
+            *self.root_args,
             "--actor",
             "orchestrator",
             "--text",